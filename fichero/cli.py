@@ -7,17 +7,19 @@ import sys
 
 from PIL import Image
 
-from fichero.imaging import image_to_raster, prepare_image, text_to_image
+from fichero.imaging import prepare_raster, text_to_image
 from fichero.printer import (
     BYTES_PER_ROW,
-    DELAY_AFTER_DENSITY,
+    BytesLike,
     DELAY_AFTER_FEED,
     DELAY_COMMAND_GAP,
     DELAY_RASTER_SETTLE,
     PAPER_GAP,
+    PRINTHEAD_PX,
     PrinterClient,
     PrinterError,
     PrinterNotReady,
+    PrinterTimeout,
     connect,
 )
 
@@ -29,18 +31,42 @@ async def do_print(
     paper: int = PAPER_GAP,
     copies: int = 1,
 ) -> bool:
-    img = prepare_image(img)
-    rows = img.height
-    raster = image_to_raster(img)
+    rows, raster = prepare_raster(img)
+    return await do_print_raster(pc, raster, rows, density, paper, copies)
 
-    print(f"  Image: {img.width}x{rows}, {len(raster)} bytes, {copies} copies")
+
+async def do_print_raster(
+    pc: PrinterClient,
+    raster: BytesLike,
+    rows: int,
+    density: int = 1,
+    paper: int = PAPER_GAP,
+    copies: int = 1,
+) -> bool:
+    """Print pre-packed raster data: 12 bytes/row, MSB first, 1 = black.
+
+    For callers that render without PIL image processing. Pass NumPy output
+    as memoryview(arr); the 2-D array from numpy.packbits(bits, axis=1) works.
+    """
+    mv = memoryview(raster).cast("B")  # flat byte view; len() is the byte count
+    if mv.nbytes != rows * BYTES_PER_ROW:
+        raise ValueError(f"Expected {rows * BYTES_PER_ROW} raster bytes, got {mv.nbytes}")
+
+    print(f"  Image: {PRINTHEAD_PX}x{rows}, {mv.nbytes} bytes, {copies} copies")
 
     status = await pc.get_status()
     if not status.ok:
         raise PrinterNotReady(f"Printer not ready: {status}")
 
+    # Raster image: GS v 0 m xL xH yL yH <data>, built once for all copies
+    yl = rows & 0xFF
+    yh = (rows >> 8) & 0xFF
+    payload = bytearray(8 + mv.nbytes)
+    payload[:8] = (0x1D, 0x76, 0x30, 0x00, BYTES_PER_ROW, 0x00, yl, yh)
+    payload[8:] = mv
+
+    # set_density/set_paper_type wait for the printer's "OK", so no sleep after them
     await pc.set_density(density)
-    await asyncio.sleep(DELAY_AFTER_DENSITY)
 
     for copy_num in range(copies):
         if copies > 1:
@@ -48,17 +74,11 @@ async def do_print(
 
         # AiYin print sequence (from decompiled APK)
         await pc.set_paper_type(paper)
-        await asyncio.sleep(DELAY_COMMAND_GAP)
         await pc.wakeup()
         await asyncio.sleep(DELAY_COMMAND_GAP)
         await pc.enable()
         await asyncio.sleep(DELAY_COMMAND_GAP)
-
-        # Raster image: GS v 0 m xL xH yL yH <data>
-        yl = rows & 0xFF
-        yh = (rows >> 8) & 0xFF
-        header = bytes([0x1D, 0x76, 0x30, 0x00, BYTES_PER_ROW, 0x00, yl, yh])
-        await pc.send_chunked(header + raster)
+        await pc.send_chunked(payload)
 
         await asyncio.sleep(DELAY_RASTER_SETTLE)
         await pc.form_feed()
@@ -73,12 +93,15 @@ async def do_print(
 
 async def cmd_info(args: argparse.Namespace) -> None:
     async with connect(args.address) as pc:
-        info = await pc.get_info()
+        try:
+            all_info = await pc.get_all_info()
+        except PrinterTimeout:
+            all_info = {}
+        info = await pc.get_info(all_info)
         for k, v in info.items():
             print(f"  {k}: {v}")
 
         print()
-        all_info = await pc.get_all_info()
         for k, v in all_info.items():
             print(f"  {k}: {v}")
 
@@ -1,25 +1,42 @@
 """Image processing for Fichero D11s thermal label printer."""
 
 import logging
+from functools import lru_cache
 
-from PIL import Image, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageOps
 
 from fichero.printer import PRINTHEAD_PX
 
 log = logging.getLogger(__name__)
 
+# 1-bit threshold as a lookup table: dark pixels (< 128) become black (1).
+# A precomputed table keeps img.point() in C instead of calling a lambda per pixel.
+_THRESHOLD_LUT = bytes([1] * 128 + [0] * 128)
 
-def prepare_image(img: Image.Image, max_rows: int = 240) -> Image.Image:
-    """Convert any image to 96px wide, 1-bit, black on white."""
+
+def prepare_image(
+    img: Image.Image,
+    max_rows: int = 240,
+    resample: Image.Resampling = Image.Resampling.BILINEAR,
+) -> Image.Image:
+    """Convert any image to 96px wide, 1-bit, black on white.
+
+    The 1-bit threshold hides the difference between resampling filters, so
+    BILINEAR is the default; pass LANCZOS for fine photographic detail.
+    """
+    if img.mode == "1" and img.width == PRINTHEAD_PX and img.height <= max_rows:
+        # Already print-sized 1-bit: PIL stores 0 = black, the printer wants
+        # 1 = black, so a C-level invert is all that is needed.
+        return ImageChops.invert(img)
     img = img.convert("L")
     w, h = img.size
     new_h = int(h * (PRINTHEAD_PX / w))
     if new_h > max_rows:
         log.warning("Image height %dpx exceeds max %dpx, cropping bottom", new_h, max_rows)
         new_h = max_rows
-    img = img.resize((PRINTHEAD_PX, new_h), Image.LANCZOS)
+    img = img.resize((PRINTHEAD_PX, new_h), resample)
     img = ImageOps.autocontrast(img, cutoff=1)
-    img = img.point(lambda x: 1 if x < 128 else 0, "1")
+    img = img.point(_THRESHOLD_LUT, "1")
     return img
 
 
@@ -32,6 +49,24 @@ def image_to_raster(img: Image.Image) -> bytes:
     return img.tobytes()
 
 
+def prepare_raster(
+    img: Image.Image,
+    max_rows: int = 240,
+    resample: Image.Resampling = Image.Resampling.BILINEAR,
+) -> tuple[int, bytes]:
+    """Convert any image straight to (rows, raster bytes) ready for printing."""
+    img = prepare_image(img, max_rows, resample)
+    # prepare_image always yields a 96px wide "1" image, which PIL packs
+    # MSB first in C - no need to re-validate it via image_to_raster().
+    return img.height, img.tobytes()
+
+
+@lru_cache(maxsize=8)
+def _load_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Load the bundled default font once per size; parsing it is not free."""
+    return ImageFont.load_default(size=size)
+
+
 def text_to_image(text: str, font_size: int = 30, label_height: int = 240) -> Image.Image:
     """Render crisp 1-bit text, rotated 90 degrees for label printing."""
     canvas_w = label_height
@@ -40,7 +75,7 @@ def text_to_image(text: str, font_size: int = 30, label_height: int = 240) -> Im
     draw = ImageDraw.Draw(img)
     draw.fontmode = "1"  # disable antialiasing - pure 1-bit glyph rendering
 
-    font = ImageFont.load_default(size=font_size)
+    font = _load_font(font_size)
 
     bbox = draw.textbbox((0, 0), text, font=font)
     tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
@@ -7,11 +7,17 @@ Device class: AiYinNormalDevice (LuckPrinter SDK)
 """
 
 import asyncio
+import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
 
 from bleak import BleakClient, BleakGATTCharacteristic, BleakScanner
 from bleak.backends.device import BLEDevice
+from bleak.exc import BleakDeviceNotFoundError, BleakError
+
+log = logging.getLogger(__name__)
 
 # --- BLE identifiers ---
 
@@ -25,7 +31,13 @@ NOTIFY_UUID = "00002af0-0000-1000-8000-00805f9b34fb"
 
 PRINTHEAD_PX = 96
 BYTES_PER_ROW = PRINTHEAD_PX // 8  # 12
-CHUNK_SIZE = 200
+ATT_WRITE_OVERHEAD = 3  # opcode + handle in each ATT write
+MIN_CHUNK_SIZE = 20  # payload of the default 23-byte ATT MTU
+MAX_NOTIFY_FRAMES = 32  # notifications kept per reply; unsolicited ones age out
+
+# Raw data accepted for BLE writes; wrap other buffers (e.g. NumPy arrays)
+# in memoryview() first.
+BytesLike = bytes | bytearray | memoryview
 
 # --- Paper types for 10 FF 84 nn ---
 
@@ -33,14 +45,34 @@ PAPER_GAP = 0x00
 PAPER_BLACK_MARK = 0x01
 PAPER_CONTINUOUS = 0x02
 
+# --- Commands (static byte strings, built once) ---
+
+_CMD_GET_MODEL = b"\x10\xff\x20\xf0"
+_CMD_GET_FIRMWARE = b"\x10\xff\x20\xf1"
+_CMD_GET_SERIAL = b"\x10\xff\x20\xf2"
+_CMD_GET_BOOT_VERSION = b"\x10\xff\x20\xef"
+_CMD_GET_BATTERY = b"\x10\xff\x50\xf1"
+_CMD_GET_STATUS = b"\x10\xff\x40"
+_CMD_GET_DENSITY = b"\x10\xff\x11"
+_CMD_GET_SHUTDOWN_TIME = b"\x10\xff\x13"
+_CMD_GET_ALL_INFO = b"\x10\xff\x70"
+_CMD_SET_DENSITY = b"\x10\xff\x10\x00"      # + level
+_CMD_SET_PAPER_TYPE = b"\x10\xff\x84"       # + paper
+_CMD_SET_SHUTDOWN_TIME = b"\x10\xff\x12"    # + minutes (big-endian u16)
+_CMD_FACTORY_RESET = b"\x10\xff\x04"
+_CMD_WAKEUP = b"\x00" * 12
+_CMD_ENABLE = b"\x10\xff\xfe\x01"
+_CMD_FEED_DOTS = b"\x1b\x4a"                # + dots
+_CMD_FORM_FEED = b"\x1d\x0c"
+_CMD_STOP_PRINT = b"\x10\xff\xfe\x45"
+
 # --- Timing (seconds) - empirically tuned against D11s fw 2.4.6 ---
 
-DELAY_AFTER_DENSITY = 0.10   # printer needs time to apply density setting
+CONNECT_TIMEOUT = 8.0        # find + connect to a given address (bleak default: 30s)
 DELAY_COMMAND_GAP = 0.05     # minimum gap between sequential commands
-DELAY_CHUNK_GAP = 0.02       # inter-chunk pacing for BLE throughput
 DELAY_RASTER_SETTLE = 0.50   # wait for printhead after raster transfer
 DELAY_AFTER_FEED = 0.30      # wait after form feed before stop command
-DELAY_NOTIFY_EXTRA = 0.05    # extra wait for trailing BLE notification fragments
+DELAY_NOTIFY_EXTRA = 0.05    # quiet period that ends a multi-fragment reply
 
 
 # --- Exceptions ---
@@ -70,7 +102,7 @@ async def find_printer() -> BLEDevice:
     print("Scanning for printer...")
     devices = await BleakScanner.discover(timeout=8)
     for d in devices:
-        if d.name and any(d.name.startswith(p) for p in PRINTER_NAME_PREFIXES):
+        if d.name and d.name.startswith(PRINTER_NAME_PREFIXES):
             print(f"  Found {d.name} at {d.address}")
             return d  # Return full BLEDevice, not just address
     raise PrinterNotFound("No Fichero/D11s printer found. Is it turned on?")
@@ -79,17 +111,27 @@ async def find_printer() -> BLEDevice:
 # --- Status ---
 
 
+@dataclass(frozen=True, slots=True)
 class PrinterStatus:
-    """Parsed status byte from 10 FF 40."""
-
-    def __init__(self, byte: int):
-        self.raw = byte
-        self.printing = bool(byte & 0x01)
-        self.cover_open = bool(byte & 0x02)
-        self.no_paper = bool(byte & 0x04)
-        self.low_battery = bool(byte & 0x08)
-        self.overheated = bool(byte & 0x10 or byte & 0x40)
-        self.charging = bool(byte & 0x20)
+    """Parsed status byte from 10 FF 40. Immutable, so instances can be shared."""
+
+    raw: int
+    printing: bool = field(init=False)
+    cover_open: bool = field(init=False)
+    no_paper: bool = field(init=False)
+    low_battery: bool = field(init=False)
+    overheated: bool = field(init=False)
+    charging: bool = field(init=False)
+
+    def __post_init__(self) -> None:
+        byte = self.raw
+        set_ = object.__setattr__  # frozen dataclass: bypass the generated __setattr__
+        set_(self, "printing", bool(byte & 0x01))
+        set_(self, "cover_open", bool(byte & 0x02))
+        set_(self, "no_paper", bool(byte & 0x04))
+        set_(self, "low_battery", bool(byte & 0x08))
+        set_(self, "overheated", bool(byte & 0x50))  # 0x10 (alt) or 0x40
+        set_(self, "charging", bool(byte & 0x20))
 
     def __str__(self) -> str:
         flags = []
@@ -112,87 +154,158 @@ class PrinterStatus:
         return not (self.cover_open or self.no_paper or self.overheated)
 
 
+@lru_cache(maxsize=256)
+def parse_status(byte: int) -> PrinterStatus:
+    """Return the PrinterStatus for a status byte, shared across polls.
+
+    There are only 256 possible values, so tight polling loops reuse one
+    (immutable) instance per byte.
+    """
+    return PrinterStatus(byte)
+
+
 # --- Client ---
 
 
 class PrinterClient:
     def __init__(self, client: BleakClient):
         self.client = client
-        self._buf = bytearray()
-        self._event = asyncio.Event()
+        self._rx: asyncio.Queue[bytes] = asyncio.Queue(maxsize=MAX_NOTIFY_FRAMES)
         self._lock = asyncio.Lock()
+        self._mtu: int | None = None
 
     def _on_notify(self, _char: BleakGATTCharacteristic, data: bytearray) -> None:
-        self._buf.extend(data)
-        self._event.set()
+        if self._rx.full():
+            self._rx.get_nowait()  # drop the oldest frame, keep the newest
+        self._rx.put_nowait(bytes(data))
 
     async def start(self) -> None:
         await self.client.start_notify(NOTIFY_UUID, self._on_notify)
+        self._mtu = await self._write_payload_size()
+
+    async def _write_payload_size(self) -> int:
+        """Bytes per write-without-response: the negotiated ATT MTU minus 3.
+
+        bleak reports this per characteristic; on BlueZ >= 5.62 it comes from
+        the MTU property the stack negotiated on connect (up to 517). Older
+        BlueZ lacks that property and shows the 23-byte default, so fall back
+        to bleak's AcquireWrite-based MTU lookup. If that is refused too,
+        send 20-byte chunks.
+        """
+        char = self.client.services.get_characteristic(WRITE_UUID)
+        size = char.max_write_without_response_size if char else MIN_CHUNK_SIZE
+        if size > MIN_CHUNK_SIZE:
+            return size
+        acquire = getattr(getattr(self.client, "_backend", None), "_acquire_mtu", None)
+        if acquire is None:
+            return MIN_CHUNK_SIZE
+        try:
+            await acquire()
+        except BleakError as e:
+            log.warning("Could not acquire ATT MTU (%s), falling back to %d-byte chunks",
+                        e, MIN_CHUNK_SIZE)
+            return MIN_CHUNK_SIZE
+        return max(MIN_CHUNK_SIZE, self.client.mtu_size - ATT_WRITE_OVERHEAD)
 
-    async def send(self, data: bytes, wait: bool = False, timeout: float = 2.0) -> bytes:
+    @property
+    def chunk_size(self) -> int:
+        """Raster bytes per BLE write: negotiated MTU minus the ATT header."""
+        return self._mtu or MIN_CHUNK_SIZE
+
+    async def send(
+        self,
+        data: bytes,
+        wait: bool = False,
+        timeout: float = 2.0,
+        reply_len: int | None = None,
+    ) -> bytes:
+        """Write a command; with wait=True, return the printer's reply.
+
+        Only request/reply exchanges take the lock, so their replies cannot
+        interleave. Fire-and-forget writes go straight out - BlueZ already
+        serializes GATT writes.
+
+        Replies may be split over several notifications, so collection ends
+        once DELAY_NOTIFY_EXTRA passes without a new frame. Commands with a
+        fixed-length reply (e.g. "OK", the status byte) pass reply_len to
+        return as soon as that many bytes have arrived.
+        """
+        if not wait:
+            await self.client.write_gatt_char(WRITE_UUID, data, response=False)
+            return b""
         async with self._lock:
-            if wait:
-                self._buf.clear()
-                self._event.clear()
+            while not self._rx.empty():  # drop unsolicited/stale frames
+                self._rx.get_nowait()
             await self.client.write_gatt_char(WRITE_UUID, data, response=False)
-            if wait:
+            try:
+                frame = await asyncio.wait_for(self._rx.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise PrinterTimeout(f"No response within {timeout}s")
+            frames = [frame]
+            received = len(frame)
+            while reply_len is None or received < reply_len:
                 try:
-                    await asyncio.wait_for(self._event.wait(), timeout=timeout)
-                    await asyncio.sleep(DELAY_NOTIFY_EXTRA)
+                    frame = await asyncio.wait_for(self._rx.get(), timeout=DELAY_NOTIFY_EXTRA)
                 except asyncio.TimeoutError:
-                    raise PrinterTimeout(f"No response within {timeout}s")
-        return bytes(self._buf)
+                    break
+                frames.append(frame)
+                received += len(frame)
+            return b"".join(frames)
 
-    async def send_chunked(self, data: bytes, chunk_size: int = CHUNK_SIZE) -> None:
-        for i in range(0, len(data), chunk_size):
-            chunk = data[i : i + chunk_size]
-            await self.client.write_gatt_char(WRITE_UUID, chunk, response=False)
-            await asyncio.sleep(DELAY_CHUNK_GAP)
+    async def send_chunked(self, data: BytesLike, chunk_size: int | None = None) -> None:
+        """Write data in MTU-sized slices back to back; BlueZ paces the link.
+
+        Slices the buffer (cast to flat bytes) without copying.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        mv = memoryview(data).cast("B")
+        for i in range(0, len(mv), chunk_size):
+            await self.client.write_gatt_char(WRITE_UUID, mv[i : i + chunk_size], response=False)
 
     # --- Info commands (all tested and confirmed on D11s fw 2.4.6) ---
 
     async def get_model(self) -> str:
-        r = await self.send(bytes([0x10, 0xFF, 0x20, 0xF0]), wait=True)
+        r = await self.send(_CMD_GET_MODEL, wait=True)
         return r.decode(errors="replace").strip() if r else "?"
 
     async def get_firmware(self) -> str:
-        r = await self.send(bytes([0x10, 0xFF, 0x20, 0xF1]), wait=True)
+        r = await self.send(_CMD_GET_FIRMWARE, wait=True)
         return r.decode(errors="replace").strip() if r else "?"
 
     async def get_serial(self) -> str:
-        r = await self.send(bytes([0x10, 0xFF, 0x20, 0xF2]), wait=True)
+        r = await self.send(_CMD_GET_SERIAL, wait=True)
         return r.decode(errors="replace").strip() if r else "?"
 
     async def get_boot_version(self) -> str:
-        r = await self.send(bytes([0x10, 0xFF, 0x20, 0xEF]), wait=True)
+        r = await self.send(_CMD_GET_BOOT_VERSION, wait=True)
         return r.decode(errors="replace").strip() if r else "?"
 
     async def get_battery(self) -> int:
-        r = await self.send(bytes([0x10, 0xFF, 0x50, 0xF1]), wait=True)
+        r = await self.send(_CMD_GET_BATTERY, wait=True, reply_len=2)
         if r and len(r) >= 2:
             return r[-1]
         return -1
 
     async def get_status(self) -> PrinterStatus:
-        r = await self.send(bytes([0x10, 0xFF, 0x40]), wait=True)
+        r = await self.send(_CMD_GET_STATUS, wait=True, reply_len=1)
         if r:
-            return PrinterStatus(r[-1])
-        return PrinterStatus(0xFF)
+            return parse_status(r[-1])
+        return parse_status(0xFF)
 
     async def get_density(self) -> bytes:
-        r = await self.send(bytes([0x10, 0xFF, 0x11]), wait=True)
+        r = await self.send(_CMD_GET_DENSITY, wait=True, reply_len=3)
         return r
 
     async def get_shutdown_time(self) -> int:
         """Returns auto-shutdown timeout in minutes."""
-        r = await self.send(bytes([0x10, 0xFF, 0x13]), wait=True)
+        r = await self.send(_CMD_GET_SHUTDOWN_TIME, wait=True, reply_len=2)
         if r and len(r) >= 2:
             return (r[0] << 8) | r[1]
         return -1
 
     async def get_all_info(self) -> dict:
         """10 FF 70: returns pipe-delimited string with all device info."""
-        r = await self.send(bytes([0x10, 0xFF, 0x70]), wait=True)
+        r = await self.send(_CMD_GET_ALL_INFO, wait=True)
         if not r:
             return {}
         parts = r.decode(errors="replace").split("|")
@@ -211,56 +324,65 @@ class PrinterClient:
 
     async def set_density(self, level: int) -> bool:
         """0=light, 1=medium, 2=thick. Returns True if printer responded OK."""
-        r = await self.send(bytes([0x10, 0xFF, 0x10, 0x00, level]), wait=True)
+        r = await self.send(_CMD_SET_DENSITY + bytes((level,)), wait=True, reply_len=2)
         return r == b"OK"
 
     async def set_paper_type(self, paper: int = PAPER_GAP) -> bool:
         """0=gap/label, 1=black mark, 2=continuous."""
-        r = await self.send(bytes([0x10, 0xFF, 0x84, paper]), wait=True)
+        r = await self.send(_CMD_SET_PAPER_TYPE + bytes((paper,)), wait=True, reply_len=2)
         return r == b"OK"
 
     async def set_shutdown_time(self, minutes: int) -> bool:
-        hi = (minutes >> 8) & 0xFF
-        lo = minutes & 0xFF
-        r = await self.send(bytes([0x10, 0xFF, 0x12, hi, lo]), wait=True)
+        cmd = _CMD_SET_SHUTDOWN_TIME + (minutes & 0xFFFF).to_bytes(2, "big")
+        r = await self.send(cmd, wait=True, reply_len=2)
         return r == b"OK"
 
     async def factory_reset(self) -> bool:
-        r = await self.send(bytes([0x10, 0xFF, 0x04]), wait=True)
+        r = await self.send(_CMD_FACTORY_RESET, wait=True, reply_len=2)
         return r == b"OK"
 
     # --- Print control (AiYin-specific, from decompiled APK) ---
 
     async def wakeup(self) -> None:
-        await self.send(b"\x00" * 12)
+        await self.send(_CMD_WAKEUP)
 
     async def enable(self) -> None:
         """AiYin enable: 10 FF FE 01 (NOT 10 FF F1 03)."""
-        await self.send(bytes([0x10, 0xFF, 0xFE, 0x01]))
+        await self.send(_CMD_ENABLE)
 
     async def feed_dots(self, dots: int) -> None:
         """Feed paper forward by n dots."""
-        await self.send(bytes([0x1B, 0x4A, dots & 0xFF]))
+        await self.send(_CMD_FEED_DOTS + bytes((dots & 0xFF,)))
 
     async def form_feed(self) -> None:
         """Position to next label."""
-        await self.send(bytes([0x1D, 0x0C]))
+        await self.send(_CMD_FORM_FEED)
 
     async def stop_print(self) -> bool:
         """AiYin stop: 10 FF FE 45. Waits for 0xAA or 'OK'."""
-        r = await self.send(bytes([0x10, 0xFF, 0xFE, 0x45]), wait=True, timeout=60.0)
+        r = await self.send(_CMD_STOP_PRINT, wait=True, timeout=60.0)
         if r:
             return r[0] == 0xAA or r.startswith(b"OK")
         return False
 
-    async def get_info(self) -> dict:
+    async def get_info(self, all_info: dict | None = None) -> dict:
+        """Collect device info; firmware/serial/battery come from one 10 FF 70 query.
+
+        Pass an already fetched get_all_info() result to reuse it. Fields it
+        lacks (or all of them, if 10 FF 70 times out) are queried one by one.
+        """
         status = await self.get_status()
+        if all_info is None:
+            try:
+                all_info = await self.get_all_info()
+            except PrinterTimeout:
+                all_info = {}
         return {
             "model": await self.get_model(),
-            "firmware": await self.get_firmware(),
+            "firmware": all_info.get("firmware") or await self.get_firmware(),
             "boot": await self.get_boot_version(),
-            "serial": await self.get_serial(),
-            "battery": f"{await self.get_battery()}%",
+            "serial": all_info.get("serial") or await self.get_serial(),
+            "battery": all_info.get("battery") or f"{await self.get_battery()}%",
             "status": str(status),
             "shutdown": f"{await self.get_shutdown_time()} min",
         }
@@ -268,23 +390,21 @@ class PrinterClient:
 
 @asynccontextmanager
 async def connect(address: str | BLEDevice | None = None) -> AsyncGenerator[PrinterClient, None]:
-    """Discover printer, connect, and yield a ready PrinterClient."""
-    device = address if isinstance(address, BLEDevice) else None
-    if device is None:
-        if address:
-            # Address string provided - scan to get full BLEDevice for proper BlueZ handling
-            print("Scanning for printer...")
-            devices = await BleakScanner.discover(timeout=8)
-            for d in devices:
-                if d.address.upper() == address.upper():
-                    device = d
-                    print(f"  Found {d.name} at {d.address}")
-                    break
-            if device is None:
-                raise PrinterNotFound(f"Device {address} not found during scan")
-        else:
-            device = await find_printer()
-    async with BleakClient(device) as client:
+    """Connect to the printer and yield a ready PrinterClient.
+
+    A BLEDevice or address string is passed straight to bleak, which resolves
+    known addresses without a full scan. With no address, scan for the printer.
+    Finding and connecting gives up after CONNECT_TIMEOUT seconds.
+    """
+    device = address if address else await find_printer()
+    client = BleakClient(device, timeout=CONNECT_TIMEOUT)
+    try:
+        await client.connect()
+    except BleakDeviceNotFoundError:
+        raise PrinterNotFound(f"Device {client.address} not found") from None
+    try:
         pc = PrinterClient(client)
         await pc.start()
         yield pc
+    finally:
+        await client.disconnect()